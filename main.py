@@ -23,12 +23,13 @@ Examples:
 """
 
 import argparse
+import heapq
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
 from src.orchestrator import TriageOrchestrator
-from src.llm_classifier import LLMClassifier
 
 
 GUIDE = """
@@ -191,137 +192,149 @@ def main():
         llm_model=llm_model,
     )
 
-    if args.command == "balance":
-        classifier = LLMClassifier(openrouter_key, model=llm_model)
-        remaining, usage, formatted = classifier.check_balance()
-        print("\n" + "=" * 50)
-        print("OpenRouter Account Balance")
-        print("=" * 50)
-        print(formatted)
-        if remaining < 0.10:
-            print("\n⚠️  Warning: Low balance! Add credits at https://openrouter.ai/credits")
-        else:
-            print("\n✓ Balance OK")
-        sys.exit(0)
-
-    if args.command == "test":
-        print("Testing connections...")
-        try:
-            orchestrator.connect()
-            print("✓ Google Sheets connection successful")
-
-            issues = orchestrator.fetcher.fetch_open_issues(max_pages=1)
-            print(f"✓ GitHub API working ({len(issues)} issues fetched)")
-
-            classifier = LLMClassifier(openrouter_key, model=llm_model)
-            remaining, _, balance_str = classifier.check_balance()
-            print(f"✓ OpenRouter API working ({balance_str})")
+    try:
+        if args.command == "balance":
+            remaining, usage, formatted = orchestrator.classifier.check_balance()
+            print("\n" + "=" * 50)
+            print("OpenRouter Account Balance")
+            print("=" * 50)
+            print(formatted)
+            if remaining < 0.10:
+                print("\n⚠️  Warning: Low balance! Add credits at https://openrouter.ai/credits")
+            else:
+                print("\n✓ Balance OK")
+            sys.exit(0)
+
+        if args.command == "test":
+            print("Testing connections...")
+
+            # The three probes are independent network calls, so run them side by
+            # side and report each one as it finishes.
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                probes = {
+                    executor.submit(orchestrator.connect):
+                        lambda _: "✓ Google Sheets connection successful",
+                    executor.submit(orchestrator.fetcher.fetch_open_issues, max_pages=1):
+                        lambda issues: f"✓ GitHub API working ({len(issues)} issues fetched)",
+                    executor.submit(orchestrator.classifier.check_balance):
+                        lambda balance: f"✓ OpenRouter API working ({balance[2]})",
+                }
+                try:
+                    for future in as_completed(probes):
+                        print(probes[future](future.result()))
+                except Exception as e:
+                    print(f"✗ Connection failed: {e}")
+                    sys.exit(1)
 
             print("\nAll connections working!")
-        except Exception as e:
-            print(f"✗ Connection failed: {e}")
-            sys.exit(1)
-
-    elif args.command == "init":
-        max_pages = None if args.all else args.max_pages
-        if args.all:
-            print("Running FULL triage (all open issues - this may take hours)...")
-            remaining, _, _ = LLMClassifier(openrouter_key, model=llm_model).check_balance()
-            if remaining < 5.0:
-                print(f"⚠️  Warning: Only ${remaining:.2f} remaining. Full run may cost ~$4-5.")
-                response = input("Continue? [y/N]: ")
-                if response.lower() != 'y':
-                    sys.exit(0)
-        else:
-            print("Running initial triage...")
+
+        elif args.command == "init":
+            max_pages = None if args.all else args.max_pages
+            if args.all:
+                print("Running FULL triage (all open issues - this may take hours)...")
+                remaining, _, _ = orchestrator.classifier.check_balance()
+                if remaining < 5.0:
+                    print(f"⚠️  Warning: Only ${remaining:.2f} remaining. Full run may cost ~$4-5.")
+                    response = input("Continue? [y/N]: ")
+                    if response.lower() != 'y':
+                        sys.exit(0)
+            else:
+                print("Running initial triage...")
         
-        stats = orchestrator.run_initial_triage(
-            max_pages=max_pages,
-            classify_candidates=not args.no_classify,
-            dry_run=args.dry_run,
-        )
-        print("\n" + "=" * 40)
-        print("Summary:")
-        print(f"  Total fetched:    {stats['total_fetched']}")
-        print(f"  New issues:       {stats['new_issues']}")
-        print(f"  Passed filters:   {stats['passed_filters']}")
-        print(f"  Auto candidates:  {stats['auto_candidates']}")
-        print(f"  Classified:       {stats['classified']}")
-        print(f"  Written to sheet: {stats['written']}")
-
-    elif args.command == "update":
-        print("Running update cycle...")
-        stats = orchestrator.run_update(max_pages=args.max_pages)
-        print("\n" + "=" * 40)
-        print("Summary:")
-        print(f"  New issues:     {stats['new_issues']}")
-        print(f"  Changed issues: {stats['changed_issues']}")
-
-    elif args.command == "retriage":
-        print("Re-triaging flagged issues...")
-        stats = orchestrator.retriage_flagged()
-        print("\n" + "=" * 40)
-        print(f"Re-triaged: {stats['retriaged']} issues")
-
-    elif args.command == "picks":
-        print("Fetching top picks from your sheet...")
-        orchestrator.connect()
-        existing = orchestrator.sheets.get_existing_issues()
-
-        picks = []
-        for issue_id, data in existing.items():
-            skill_match = data.get("LLM Skill Match", "")
-            difficulty = data.get("LLM Difficulty", "")
-            status = data.get("Current Status", "")
-            title = data.get("Title", "")
-
-            if status in ["In Progress", "PR Opened", "Completed", "Skipped"]:
-                continue
-            if skill_match not in ["Yes", "Maybe"]:
-                continue
-            if difficulty in ["High", "Beyond"]:
-                continue
-
-            score = 0
-            if skill_match == "Yes":
-                score += 3
-            if difficulty == "Easy":
-                score += 3
-            elif difficulty == "Low":
-                score += 2
-            elif difficulty == "Medium":
-                score += 1
-            if data.get("Test Focused") == "Yes":
-                score += 2
-            if data.get("Scope Clarity") == "Clear":
-                score += 1
-            if "[Flaky Test]" in title:
-                score += 3
-
-            picks.append((score, data))
-
-        picks.sort(key=lambda x: x[0], reverse=True)
-
-        print("\n" + "=" * 70)
-        print("TOP PICKS - Best issues to work on")
-        print("=" * 70)
-
-        for i, (score, data) in enumerate(picks[:args.limit], 1):
-            title = data.get("Title", "")[:45]
-            difficulty = data.get("LLM Difficulty", "?")
-            skill = data.get("LLM Skill Match", "?")
-            url = data.get("URL", "")
-            test_focused = "✓" if data.get("Test Focused") == "Yes" else " "
-            scope = data.get("Scope Clarity", "?")[:5]
-            reason = data.get("Reason", "")[:60]
-
-            print(f"\n{i}. [{difficulty}] {title}...")
-            print(f"   Skill: {skill} | Test: {test_focused} | Scope: {scope}")
-            print(f"   {reason}")
-            print(f"   {url}")
-
-        print(f"\n{'=' * 70}")
-        print(f"Showing {min(len(picks), args.limit)} of {len(picks)} candidates")
+            stats = orchestrator.run_initial_triage(
+                max_pages=max_pages,
+                classify_candidates=not args.no_classify,
+                dry_run=args.dry_run,
+            )
+            print("\n" + "=" * 40)
+            print("Summary:")
+            print(f"  Total fetched:    {stats['total_fetched']}")
+            print(f"  New issues:       {stats['new_issues']}")
+            print(f"  Passed filters:   {stats['passed_filters']}")
+            print(f"  Auto candidates:  {stats['auto_candidates']}")
+            print(f"  Classified:       {stats['classified']}")
+            print(f"  Written to sheet: {stats['written']}")
+
+        elif args.command == "update":
+            print("Running update cycle...")
+            stats = orchestrator.run_update(max_pages=args.max_pages)
+            print("\n" + "=" * 40)
+            print("Summary:")
+            print(f"  New issues:     {stats['new_issues']}")
+            print(f"  Changed issues: {stats['changed_issues']}")
+
+        elif args.command == "retriage":
+            print("Re-triaging flagged issues...")
+            stats = orchestrator.retriage_flagged()
+            print("\n" + "=" * 40)
+            print(f"Re-triaged: {stats['retriaged']} issues")
+
+        elif args.command == "picks":
+            print("Fetching top picks from your sheet...")
+            orchestrator.connect()
+            existing = orchestrator.sheets.get_existing_issues()
+
+            total = 0
+
+            def scored_picks():
+                nonlocal total
+                for issue_id, data in existing.items():
+                    skill_match = data.get("LLM Skill Match", "")
+                    difficulty = data.get("LLM Difficulty", "")
+                    status = data.get("Current Status", "")
+                    title = data.get("Title", "")
+
+                    if status in ["In Progress", "PR Opened", "Completed", "Skipped"]:
+                        continue
+                    if skill_match not in ["Yes", "Maybe"]:
+                        continue
+                    if difficulty in ["High", "Beyond"]:
+                        continue
+
+                    score = 0
+                    if skill_match == "Yes":
+                        score += 3
+                    if difficulty == "Easy":
+                        score += 3
+                    elif difficulty == "Low":
+                        score += 2
+                    elif difficulty == "Medium":
+                        score += 1
+                    if data.get("Test Focused") == "Yes":
+                        score += 2
+                    if data.get("Scope Clarity") == "Clear":
+                        score += 1
+                    if "[Flaky Test]" in title:
+                        score += 3
+
+                    total += 1
+                    yield score, data
+
+            # Only the top `limit` picks are needed: O(N log limit), no full sort
+            top = heapq.nlargest(args.limit, scored_picks(), key=lambda x: x[0])
+
+            print("\n" + "=" * 70)
+            print("TOP PICKS - Best issues to work on")
+            print("=" * 70)
+
+            for i, (score, data) in enumerate(top, 1):
+                title = data.get("Title", "")[:45]
+                difficulty = data.get("LLM Difficulty", "?")
+                skill = data.get("LLM Skill Match", "?")
+                url = data.get("URL", "")
+                test_focused = "✓" if data.get("Test Focused") == "Yes" else " "
+                scope = data.get("Scope Clarity", "?")[:5]
+                reason = data.get("Reason", "")[:60]
+
+                print(f"\n{i}. [{difficulty}] {title}...")
+                print(f"   Skill: {skill} | Test: {test_focused} | Scope: {scope}")
+                print(f"   {reason}")
+                print(f"   {url}")
+
+            print(f"\n{'=' * 70}")
+            print(f"Showing {len(top)} of {total} candidates")
+    finally:
+        orchestrator.close()
 
 
 if __name__ == "__main__":
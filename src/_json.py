@@ -0,0 +1,6 @@
+"""JSON helpers: orjson when available, falling back to the stdlib."""
+
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:  # Pinned in requirements.txt; the fallback only costs speed
+    from json import dumps as json_dumps, loads as json_loads
@@ -0,0 +1,67 @@
+"""Small SQLite-backed cache that persists between runs."""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from ._json import json_dumps, json_loads
+
+
+class DiskCache:
+    """Thread-safe key/value store for JSON-serializable values."""
+
+    def __init__(self, path: str, ttl: Optional[float] = None):
+        """
+        Open (or create) a cache file.
+
+        Args:
+            path: Path to the SQLite database file
+            ttl: Seconds an entry stays valid (None keeps entries forever)
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            if ttl is not None:
+                self._conn.execute("DELETE FROM cache WHERE stored_at < ?", (time.time() - ttl,))
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        value, stored_at = row
+        if self.ttl is not None and time.time() - stored_at > self.ttl:
+            return None
+        return json_loads(value)
+
+    def set(self, key: str, value: Any):
+        """Store a value under key, replacing any previous entry."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json_dumps(value), time.time()),
+            )
+
+    def touch(self, key: str):
+        """Restart the TTL of an existing entry without rewriting its value."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE cache SET stored_at = ? WHERE key = ?", (time.time(), key))
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -1,35 +1,29 @@
 """Rule-based filtering for GitHub issues."""
 
-from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import NamedTuple, Optional
 
 
-@dataclass
-class FilterResult:
+class FilterResult(NamedTuple):
     """Result of applying filters to an issue."""
 
     passed: bool
     is_auto_candidate: bool
     exclude_reason: Optional[str] = None
-    positive_signals: list[str] = None
-
-    def __post_init__(self):
-        if self.positive_signals is None:
-            self.positive_signals = []
+    positive_signals: tuple[str, ...] = ()
 
 
 class IssueFilter:
     """Rule-based filter for GitHub issues."""
 
-    EXCLUDE_LABELS = {
+    EXCLUDE_LABELS = frozenset({
         "blocker",
         "[Status] Blocked",
         "[Priority] High",
         "Needs Design",
         "Needs Design Feedback",
         "[Status] Stale",
-    }
+    })
 
     POSITIVE_LABELS = {
         "Needs Tests",
@@ -65,6 +59,13 @@ class IssueFilter:
         "snapshot",
     }
 
+    # Lowercased patterns and preformatted signal strings, built once at import
+    _POSITIVE_LABELS_LC = tuple(label.lower() for label in POSITIVE_LABELS)
+    _HIGH_VALUE_SIGNALS = tuple(
+        (pattern, pattern.lower(), f"High-value: {pattern}") for pattern in HIGH_VALUE_PATTERNS
+    )
+    _KEYWORD_SIGNALS = tuple((keyword, f"Keyword: {keyword}") for keyword in POSITIVE_KEYWORDS)
+
     def filter_issue(self, issue: dict) -> FilterResult:
         """
         Apply rule-based filters to an issue.
@@ -76,41 +77,44 @@ class IssueFilter:
             FilterResult with pass/fail status and signals
         """
         labels = set(issue.get("labels", []))
-        title = issue.get("title", "")
-        title_lower = title.lower()
-        body_lower = (issue.get("body") or "").lower()
 
-        for exclude_label in self.EXCLUDE_LABELS:
-            if exclude_label in labels:
-                return FilterResult(
-                    passed=False,
-                    is_auto_candidate=False,
-                    exclude_reason=f"Excluded label: {exclude_label}",
-                )
+        excluded = labels & self.EXCLUDE_LABELS
+        if excluded:
+            return FilterResult(
+                passed=False,
+                is_auto_candidate=False,
+                exclude_reason=f"Excluded label: {next(iter(excluded))}",
+            )
+
+        return self._passing_result(issue, labels)
+
+    def _passing_result(self, issue: dict, labels: set[str]) -> FilterResult:
+        """Collect positive signals for an issue that has no excluded labels."""
+        title_lower = issue.get("title", "").lower()
+        body_lower = (issue.get("body") or "").lower()
+        text_content = f"{title_lower} {body_lower}"
 
         positive_signals = []
 
-        for pattern in self.HIGH_VALUE_PATTERNS:
-            if pattern.lower() in title_lower or pattern in labels:
-                positive_signals.append(f"High-value: {pattern}")
+        for pattern, pattern_lower, signal in self._HIGH_VALUE_SIGNALS:
+            if pattern_lower in title_lower or pattern in labels:
+                positive_signals.append(signal)
 
-        for pos_label in self.POSITIVE_LABELS:
-            for label in labels:
-                if pos_label.lower() in label.lower():
+        labels_lc = [(label, label.lower()) for label in labels]
+        for pos_label in self._POSITIVE_LABELS_LC:
+            for label, label_lower in labels_lc:
+                if pos_label in label_lower:
                     positive_signals.append(f"Label: {label}")
                     break
 
-        text_content = f"{title_lower} {body_lower}"
-        for keyword in self.POSITIVE_KEYWORDS:
+        for keyword, signal in self._KEYWORD_SIGNALS:
             if keyword in text_content:
-                positive_signals.append(f"Keyword: {keyword}")
-
-        is_auto_candidate = len(positive_signals) >= 2
+                positive_signals.append(signal)
 
         return FilterResult(
             passed=True,
-            is_auto_candidate=is_auto_candidate,
-            positive_signals=positive_signals,
+            is_auto_candidate=len(positive_signals) >= 2,
+            positive_signals=tuple(positive_signals),
         )
 
     def is_high_value(self, issue: dict) -> bool:
@@ -141,9 +145,14 @@ class IssueFilter:
 
     def filter_batch(self, issues: list[dict]) -> list[tuple[dict, FilterResult]]:
         """Filter a batch of issues, returning issues that passed with their results."""
-        results = []
-        for issue in issues:
-            result = self.filter_issue(issue)
-            if result.passed:
-                results.append((issue, result))
-        return results
+        # Run the exclude check over the whole batch first so results are
+        # only built for issues that pass.
+        label_sets = [set(issue.get("labels", [])) for issue in issues]
+        excluded = [not self.EXCLUDE_LABELS.isdisjoint(labels) for labels in label_sets]
+
+        passing_result = self._passing_result
+        return [
+            (issue, passing_result(issue, labels))
+            for issue, labels, is_excluded in zip(issues, label_sets, excluded)
+            if not is_excluded
+        ]
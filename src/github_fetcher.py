@@ -1,7 +1,41 @@
 """GitHub Issue Fetcher for WordPress/Gutenberg repository."""
 
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from urllib.parse import urlencode
+
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ._json import json_loads
+from .disk_cache import DiskCache
+
+
+# Matches the page number of the rel="last" entry in a GitHub Link header
+LAST_PAGE_RE = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+# Fields requested per issue in batched GraphQL lookups
+ISSUE_FIELDS_FRAGMENT = """
+fragment IssueFields on Issue {
+  number
+  title
+  url
+  body
+  updatedAt
+  createdAt
+  assignees(first: 1) { nodes { login } }
+  labels(first: 30) { nodes { name } }
+  comments(last: %(max_comments)d) {
+    totalCount
+    nodes { author { login } body createdAt authorAssociation }
+  }
+  timelineItems(first: 50, itemTypes: [CROSS_REFERENCED_EVENT]) {
+    nodes { ... on CrossReferencedEvent { source { ... on PullRequest { number } } } }
+  }
+}
+"""
 
 
 class GitHubFetcher:
@@ -9,8 +43,18 @@ class GitHubFetcher:
 
     BASE_URL = "https://api.github.com"
     DEFAULT_REPO = "WordPress/gutenberg"
+    PAGE_WORKERS = 10  # Concurrent page requests when paginating
+    GRAPHQL_BATCH_SIZE = 50  # Issues per GraphQL query (keeps node cost low)
 
-    def __init__(self, token: str, repo: str = DEFAULT_REPO):
+    DEFAULT_CACHE_PATH = ".cache/github_etags.sqlite"
+    CACHE_TTL = 30 * 24 * 3600  # Drop ETag entries unused for 30 days
+
+    def __init__(
+        self,
+        token: str,
+        repo: str = DEFAULT_REPO,
+        cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+    ):
         self.token = token
         self.repo = repo
         self.headers = {
@@ -18,6 +62,30 @@ class GitHubFetcher:
             "Accept": "application/vnd.github.v3+json",
         }
 
+        # One pooled session for every call: connections (and TLS) are reused
+        # and transient failures are retried centrally.
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],  # POST is only used for read-only GraphQL
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=retry)
+        self._session.mount("https://", adapter)
+
+        # Conditional-GET cache: a 304 costs no primary rate limit
+        self._cache = DiskCache(cache_path, ttl=self.CACHE_TTL) if cache_path else None
+
+    def close(self):
+        """Release pooled connections and the ETag cache."""
+        self._session.close()
+        if self._cache:
+            self._cache.close()
+
     def fetch_open_issues(
         self,
         per_page: int = 100,
@@ -30,51 +98,118 @@ class GitHubFetcher:
         Args:
             per_page: Number of issues per page (max 100)
             max_pages: Maximum number of pages to fetch (None for all)
-            since: Only fetch issues updated after this ISO 8601 timestamp
+            since: Only fetch issues updated at or after this ISO 8601 timestamp
 
         Returns:
             List of issue dictionaries with relevant metadata
         """
-        issues = []
-        page = 1
+        return self.fetch_updated_issues(since, max_pages=max_pages, per_page=per_page)[0]
+
+    def fetch_updated_issues(
+        self,
+        since: Optional[str],
+        max_pages: Optional[int] = None,
+        per_page: int = 100,
+    ) -> tuple[list[dict], bool]:
+        """
+        Fetch open issues (excluding PRs) updated at or after `since`.
+
+        Args:
+            since: ISO 8601 timestamp (None for all open issues)
+            max_pages: Maximum number of pages to fetch (None for all)
+            per_page: Number of issues per page (max 100)
+
+        Returns:
+            (issues, complete) where complete is False if max_pages cut the
+            listing short, i.e. some issues in the window were not fetched
+        """
         url = f"{self.BASE_URL}/repos/{self.repo}/issues"
+        params = {
+            "state": "open",
+            "per_page": per_page,
+            "sort": "updated",
+            "direction": "desc",
+        }
+        if since:
+            params["since"] = since
 
-        while True:
-            params = {
-                "state": "open",
-                "per_page": per_page,
-                "page": page,
-                "sort": "updated",
-                "direction": "desc",
-            }
-            if since:
-                params["since"] = since
+        # The first page tells us how many pages exist (Link: rel="last"),
+        # so the remaining pages can be requested concurrently.
+        first_page, total_pages = self._fetch_page(url, params, 1)
+        last_page = min(total_pages, max_pages) if max_pages else total_pages
 
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
+        # Results are sorted by updated_at desc: once the first page reaches
+        # issues older than `since`, every later page is older still.
+        if since and first_page and first_page[-1]["updated_at"] < since:
+            last_page = 1
 
-            page_issues = response.json()
-            if not page_issues:
-                break
+        pages = [first_page]
+        if last_page > 1:
+            workers = min(self.PAGE_WORKERS, last_page - 1)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pages.extend(executor.map(
+                    lambda page: self._fetch_page(url, params, page)[0],
+                    range(2, last_page + 1),
+                ))
 
+        issues = []
+        for page_issues in pages:
             for issue in page_issues:
+                if since and issue["updated_at"] < since:
+                    return issues, True
                 if "pull_request" in issue:
                     continue
 
                 issues.append(self._extract_issue_data(issue))
 
-            page += 1
-            if max_pages and page > max_pages:
-                break
+        return issues, last_page >= total_pages
 
-        return issues
+    def _fetch_page(self, url: str, params: dict, page: int) -> tuple[list[dict], int]:
+        """Fetch one page of a paginated listing, returning (items, last_page)."""
+        items, link = self._get(url, params={**params, "page": page})
+
+        match = LAST_PAGE_RE.search(link)
+        last_page = int(match.group(1)) if match else page
+        return items, last_page
+
+    def _get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+    ) -> tuple[Any, str]:
+        """
+        GET a JSON resource, revalidating against the ETag cache.
+
+        Returns:
+            Tuple of (parsed JSON body, Link header)
+        """
+        key = f"{url}?{urlencode(sorted((params or {}).items()))}"
+        cached = self._cache.get(key) if self._cache else None
+
+        request_headers = dict(headers or {})
+        if cached:
+            request_headers["If-None-Match"] = cached["etag"]
+
+        response = self._session.get(url, headers=request_headers, params=params)
+        if response.status_code == 304 and cached:
+            # Still current: keep it for another CACHE_TTL
+            self._cache.touch(key)
+            return cached["body"], cached["link"]
+        response.raise_for_status()
+
+        body = json_loads(response.content)
+        link = response.headers.get("Link", "")
+        etag = response.headers.get("ETag")
+        if self._cache and etag:
+            self._cache.set(key, {"etag": etag, "link": link, "body": body})
+        return body, link
 
     def fetch_single_issue(self, issue_number: int) -> dict:
         """Fetch a single issue by number."""
         url = f"{self.BASE_URL}/repos/{self.repo}/issues/{issue_number}"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return self._extract_issue_data(response.json())
+        issue, _ = self._get(url)
+        return self._extract_issue_data(issue)
 
     def _extract_issue_data(self, issue: dict) -> dict:
         """Extract relevant metadata from a GitHub issue."""
@@ -111,9 +246,7 @@ class GitHubFetcher:
         params = {"per_page": max_comments, "direction": "desc"}
 
         try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            comments = response.json()
+            comments, _ = self._get(url, params=params)
 
             return [
                 {
@@ -139,12 +272,10 @@ class GitHubFetcher:
     def check_for_linked_prs(self, issue_number: int) -> bool:
         """Check if an issue has linked PRs via timeline events."""
         url = f"{self.BASE_URL}/repos/{self.repo}/issues/{issue_number}/timeline"
-        headers = {**self.headers, "Accept": "application/vnd.github.mockingbird-preview+json"}
+        headers = {"Accept": "application/vnd.github.mockingbird-preview+json"}
 
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            events = response.json()
+            events, _ = self._get(url, headers=headers)
 
             for event in events:
                 if event.get("event") == "cross-referenced":
@@ -154,3 +285,119 @@ class GitHubFetcher:
             return False
         except Exception:
             return False
+
+    def enrich_many(
+        self,
+        issue_numbers: list[int],
+        concurrency: int = 10,
+        max_comments: int = 25,
+        check_prs: bool = False,
+    ) -> list:
+        """
+        Fetch several issues with their recent comments concurrently.
+
+        Args:
+            issue_numbers: Issue numbers to fetch
+            concurrency: Maximum number of issues fetched at the same time
+            max_comments: Maximum number of comments to fetch per issue
+            check_prs: Also look up linked PRs (one extra request per issue)
+
+        Returns:
+            List aligned with issue_numbers holding either the issue dictionary
+            or the exception raised while fetching it
+        """
+        if not issue_numbers:
+            return []
+
+        def enrich(issue_number):
+            try:
+                issue = self.fetch_issue_with_comments(issue_number, max_comments)
+                if check_prs:
+                    issue["has_linked_pr"] = self.check_for_linked_prs(issue_number)
+                return issue
+            except Exception as e:
+                return e
+
+        # The pool size bounds in-flight requests, keeping us well under
+        # GitHub's secondary rate limits on concurrent calls.
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(issue_numbers))) as executor:
+            return list(executor.map(enrich, issue_numbers))
+
+    def graphql_fetch_issues(self, numbers: list[int], max_comments: int = 25) -> list[dict]:
+        """
+        Fetch several issues with comments and linked-PR status via GraphQL.
+
+        One query per GRAPHQL_BATCH_SIZE issues replaces the per-issue REST
+        calls for the issue, its comments and its timeline.
+
+        Args:
+            numbers: Issue numbers to fetch
+            max_comments: Maximum number of comments to fetch per issue (most recent)
+
+        Returns:
+            List of issue dictionaries (same shape as fetch_issue_with_comments,
+            plus has_linked_pr). Issues that no longer exist are omitted.
+        """
+        owner, name = self.repo.split("/", 1)
+        fragment = ISSUE_FIELDS_FRAGMENT % {"max_comments": max_comments}
+        issues = []
+
+        for start in range(0, len(numbers), self.GRAPHQL_BATCH_SIZE):
+            chunk = numbers[start:start + self.GRAPHQL_BATCH_SIZE]
+            selections = "\n".join(
+                f"i{int(n)}: issue(number: {int(n)}) {{ ...IssueFields }}" for n in chunk
+            )
+            query = (
+                "query($owner: String!, $name: String!) {\n"
+                f"  repository(owner: $owner, name: $name) {{\n{selections}\n  }}\n"
+                "}\n" + fragment
+            )
+
+            response = self._session.post(
+                f"{self.BASE_URL}/graphql",
+                json={"query": query, "variables": {"owner": owner, "name": name}},
+            )
+            response.raise_for_status()
+            payload = json_loads(response.content)
+
+            repository = (payload.get("data") or {}).get("repository")
+            if repository is None:
+                raise RuntimeError(f"GraphQL query failed: {payload.get('errors')}")
+
+            for n in chunk:
+                node = repository.get(f"i{int(n)}")
+                if node:
+                    issues.append(self._extract_graphql_issue(node))
+
+        return issues
+
+    def _extract_graphql_issue(self, node: dict) -> dict:
+        """Convert a GraphQL issue node into the fetcher's issue dictionary."""
+        assignees = node["assignees"]["nodes"]
+        issue = self._extract_issue_data({
+            "number": node["number"],
+            "title": node["title"],
+            "html_url": node["url"],
+            "labels": node["labels"]["nodes"],
+            "body": node.get("body"),
+            "updated_at": node["updatedAt"],
+            "created_at": node["createdAt"],
+            "assignee": assignees[0] if assignees else None,
+            "comments": node["comments"]["totalCount"],
+        })
+
+        # GraphQL returns the last N comments oldest-first; keep most recent first
+        issue["recent_comments"] = [
+            {
+                "author": (c.get("author") or {}).get("login", "unknown"),
+                "body": (c.get("body") or "")[:500],
+                "created_at": c.get("createdAt"),
+                "is_maintainer": c.get("authorAssociation") in ["OWNER", "MEMBER", "COLLABORATOR"],
+            }
+            for c in reversed(node["comments"]["nodes"])
+        ]
+        issue["has_linked_pr"] = any(
+            (event.get("source") or {}).get("number")
+            for event in node["timelineItems"]["nodes"]
+        )
+        return issue
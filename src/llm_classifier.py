@@ -1,13 +1,45 @@
 """LLM-based issue classification using OpenRouter."""
 
 import json
-import requests
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+from hashlib import blake2b
 from pathlib import Path
 from typing import Optional, Tuple
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ._json import json_loads
+from .disk_cache import DiskCache
+
+
+class _BackoffRetry(Retry):
+    """Retry that also waits before the first retry (urllib3 retries that one immediately)."""
+
+    def get_backoff_time(self) -> float:
+        return max(super().get_backoff_time(), self.backoff_factor)
+
+
+# {{NAME}} placeholders in the prompt files
+PLACEHOLDER_RE = re.compile(r"\{\{([A-Z_]+)\}\}")
+# A reply wrapped in a ```/```json fence; the closing fence may be missing
+FENCE_RE = re.compile(r"^```(?:json)?[ \t]*\n(.*?)(?:\n```)?\s*$", re.DOTALL)
 
-@dataclass
+
+def _compile_template(raw: str) -> str:
+    """Turn {{NAME}} placeholders into str.format fields, escaping other braces."""
+    parts = PLACEHOLDER_RE.split(raw)
+    # split() alternates literal text and placeholder names
+    parts[::2] = [text.replace("{", "{{").replace("}", "}}") for text in parts[::2]]
+    parts[1::2] = [f"{{{name.lower()}}}" for name in parts[1::2]]
+    return "".join(parts)
+
+
+@dataclass(slots=True, frozen=True)
 class Classification:
     """LLM classification result for an issue."""
 
@@ -54,17 +86,64 @@ class LLMClassifier:
     OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
     OPENROUTER_CREDITS_URL = "https://openrouter.ai/api/v1/credits"
     DEFAULT_MODEL = "deepseek/deepseek-chat"  # Cheapest with excellent reasoning
+    GROUP_SIZE = 10  # Issues per grouped prompt; accuracy drops on larger groups
+    MAX_RETRIES = 4  # Retries for rate-limited / overloaded / 5xx responses
+    RETRY_STATUSES = [429, 500, 502, 503, 504, 529]
+    BALANCE_TTL = 60  # Seconds a fetched balance is reused
+    DEFAULT_CACHE_PATH = ".cache/llm_responses.sqlite"
+    DEFAULT_CACHE_TTL = 7 * 24 * 3600  # Seconds a cached classification is reused
+    BATCH_WORKERS = 10  # Concurrent calls in classify_batch; fits the session pool
+    MAX_PROMPT_CHARS = 2500  # Budget per issue for title, labels, comments and body
+    MAX_BODY_CHARS = 2000  # Body cap when comments leave room to spare
+    COMMENTS_HEADER = "Recent comments (maintainer feedback is important):"
 
     def __init__(
         self,
         api_key: str,
         prompts_dir: str = "prompts",
         model: str = DEFAULT_MODEL,
+        cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
     ):
         self.api_key = api_key
         self.model = model
         self.prompts_dir = Path(prompts_dir)
         self._load_prompts()
+        # Parts of every request payload that never change between calls
+        self._system_msg = {"role": "system", "content": self.system_prompt}
+        self._base_payload = {"model": self.model, "temperature": 0.1}
+        # Replies keyed by (model, system prompt, user prompt): identical
+        # inputs are answered from disk instead of a paid API call.
+        self._cache = DiskCache(cache_path, ttl=cache_ttl) if cache_path else None
+        self._session = self._create_session()
+        self._balance_cache: Optional[tuple[float, Tuple[float, float, str]]] = None
+
+    def _create_session(self) -> requests.Session:
+        """Create a keep-alive session so calls reuse pooled TLS connections."""
+        session = requests.Session()
+        session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        })
+        # Exponential backoff (1s, 2s, 4s, 8s), honoring Retry-After on 429/503.
+        # read=0: a read timeout means the completion may already be generating
+        # (and billed), so it is never re-POSTed.
+        retry = _BackoffRetry(
+            total=self.MAX_RETRIES,
+            read=0,
+            backoff_factor=1,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=["GET", "POST"],
+            raise_on_status=False,
+        )
+        session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retry))
+        return session
+
+    def close(self):
+        """Release pooled connections and the response cache."""
+        self._session.close()
+        if self._cache:
+            self._cache.close()
 
     def check_balance(self) -> Tuple[float, float, str]:
         """
@@ -73,27 +152,32 @@ class LLMClassifier:
         Returns:
             Tuple of (balance, usage, formatted_string)
         """
-        headers = {"Authorization": f"Bearer {self.api_key}"}
+        if self._balance_cache:
+            fetched_at, cached = self._balance_cache
+            if time.monotonic() - fetched_at < self.BALANCE_TTL:
+                return cached
 
         try:
-            response = requests.get(self.OPENROUTER_CREDITS_URL, headers=headers, timeout=10)
+            response = self._session.get(self.OPENROUTER_CREDITS_URL, timeout=10)
             response.raise_for_status()
-            data = response.json().get("data", {})
+            data = json_loads(response.content).get("data", {})
 
             balance = data.get("total_credits", 0) or 0
             usage = data.get("total_usage", 0) or 0
             remaining = balance - usage
 
             formatted = f"Balance: ${balance:.4f} | Used: ${usage:.4f} | Remaining: ${remaining:.4f}"
+            self._balance_cache = (time.monotonic(), (remaining, usage, formatted))
             return remaining, usage, formatted
         except Exception as e:
             return 0, 0, f"Error checking balance: {e}"
 
     def _load_prompts(self):
-        """Load prompt templates from files."""
+        """Load prompt templates from files, compiled for str.format_map."""
         self.system_prompt = (self.prompts_dir / "system.md").read_text()
-        self.user_template = (self.prompts_dir / "user-template.md").read_text()
-        self.retriage_template = (self.prompts_dir / "re-triage.md").read_text()
+        self.user_template = _compile_template((self.prompts_dir / "user-template.md").read_text())
+        self.retriage_template = _compile_template((self.prompts_dir / "re-triage.md").read_text())
+        self.group_template = _compile_template((self.prompts_dir / "group-template.md").read_text())
 
     def classify_issue(
         self,
@@ -115,102 +199,252 @@ class LLMClassifier:
         user_prompt = self._build_user_prompt(issue, last_update_summary)
 
         if previous_classification:
-            user_prompt += "\n\n" + self.retriage_template.replace(
-                "{{OLD_DIFFICULTY}}", previous_classification.get("difficulty", "Unknown")
-            ).replace(
-                "{{OLD_MATCH}}", previous_classification.get("skill_match", "Unknown")
-            )
+            user_prompt += "\n\n" + self.retriage_template.format_map({
+                "old_difficulty": previous_classification.get("difficulty", "Unknown"),
+                "old_match": previous_classification.get("skill_match", "Unknown"),
+            })
+
+        cached = self._cache_get(user_prompt)
+        if cached is not None:
+            return self._parse_response(cached)
 
         try:
             response = self._call_api(user_prompt)
-            return self._parse_response(response)
+            classification = self._parse_response(response)
         except Exception as e:
             return Classification.error_result(str(e))
 
+        if not classification.error:
+            self._cache_set(user_prompt, response)
+        return classification
+
+    def _cache_key(self, user_prompt: str) -> str:
+        """Hash everything that determines the model's reply."""
+        data = f"{self.model}|{self.system_prompt}|{user_prompt}".encode()
+        return blake2b(data, digest_size=16).hexdigest()
+
+    def _cache_get(self, user_prompt: str) -> Optional[str]:
+        """Return a cached reply for this prompt, if any."""
+        return self._cache.get(self._cache_key(user_prompt)) if self._cache else None
+
+    def _cache_set(self, user_prompt: str, response: str):
+        """Remember a successfully parsed reply for this prompt."""
+        if self._cache:
+            self._cache.set(self._cache_key(user_prompt), response)
+
     def _build_user_prompt(self, issue: dict, last_update_summary: str) -> str:
         """Build the user prompt from template and issue data."""
+        title, labels_str, comments_str, body = self._prompt_fields(issue)
+
+        return self.user_template.format_map({
+            "title": title,
+            "labels": labels_str,
+            # The whole comments section is left out when there are none
+            "comments_section": f"\n\n{self.COMMENTS_HEADER}\n{comments_str}" if comments_str else "",
+            "body": body,
+        })
+
+    def _prompt_fields(self, issue: dict) -> tuple[str, str, str, str]:
+        """Return (title, labels, comments, body) for a prompt, body cut to fit MAX_PROMPT_CHARS."""
+        title = issue.get("title", "")
         labels_str = ", ".join(issue.get("labels", [])) or "None"
+        comments_str = self._format_comments(issue)
 
-        comments_str = "None"
-        if issue.get("recent_comments"):
-            comment_lines = []
-            for c in issue["recent_comments"][:5]:
-                prefix = "[MAINTAINER] " if c.get("is_maintainer") else ""
-                comment_lines.append(f"- {prefix}{c['author']}: {c['body'][:300]}")
-            comments_str = "\n".join(comment_lines) if comment_lines else "None"
-
-        return (
-            self.user_template.replace("{{TITLE}}", issue.get("title", ""))
-            .replace("{{LABELS}}", labels_str)
-            .replace("{{COMMENTS}}", comments_str)
-            .replace("{{BODY}}", issue.get("body", "")[:2000])
-        )
+        remaining = self.MAX_PROMPT_CHARS - len(title) - len(labels_str) - len(comments_str)
+        body = (issue.get("body") or "")[:max(min(remaining, self.MAX_BODY_CHARS), 0)]
+        return title, labels_str, comments_str, body
 
-    def _call_api(self, user_prompt: str) -> str:
-        """Call the OpenRouter API."""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+    def _format_comments(self, issue: dict) -> str:
+        """Format an issue's most recent comments for a prompt ("" if there are none)."""
+        comment_lines = []
+        for c in issue.get("recent_comments", [])[:5]:
+            prefix = "[MAINTAINER] " if c.get("is_maintainer") else ""
+            comment_lines.append(f"- {prefix}{c['author']}: {c['body'][:300]}")
+        return "\n".join(comment_lines)
 
+    def _call_api(self, user_prompt: str, max_tokens: int = 500, timeout: float = 30) -> str:
+        """Call the OpenRouter API."""
         payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            "temperature": 0.1,
-            "max_tokens": 500,
+            **self._base_payload,
+            "messages": [self._system_msg, {"role": "user", "content": user_prompt}],
+            "max_tokens": max_tokens,
         }
 
-        response = requests.post(
+        response = self._session.post(
             self.OPENROUTER_URL,
-            headers=headers,
             json=payload,
-            timeout=30,
+            timeout=timeout,
         )
         response.raise_for_status()
 
-        data = response.json()
+        data = json_loads(response.content)
         return data["choices"][0]["message"]["content"]
 
     def _parse_response(self, response: str) -> Classification:
         """Parse the LLM response into a Classification."""
-        content = response.strip()
-
-        if content.startswith("```"):
-            lines = content.split("\n")
-            content = "\n".join(lines[1:-1])
+        content = self._strip_code_fence(response)
 
         try:
-            data = json.loads(content)
+            data = json_loads(content)
             return Classification.from_json(data, response)
         except json.JSONDecodeError as e:
             return Classification.error_result(f"JSON parse error: {e}\nRaw: {response[:200]}")
 
+    def _strip_code_fence(self, response: str) -> str:
+        """Remove a surrounding Markdown code fence from an LLM response."""
+        content = response.strip()
+        match = FENCE_RE.match(content)
+        return match.group(1) if match else content
+
+    def classify_group(self, issues: list[dict]) -> list[Classification]:
+        """
+        Classify several issues with a single LLM call.
+
+        The system prompt and instructions are sent once for the whole group
+        instead of once per issue. If the reply can't be matched back to the
+        issues, the group is re-classified one issue per call; if the call
+        itself fails, every uncached issue gets an error result.
+
+        Args:
+            issues: Issue dictionaries (at most GROUP_SIZE for best accuracy)
+
+        Returns:
+            Classifications in the same order as issues
+        """
+        # Results are cached per issue under the single-issue prompt, so
+        # grouped and one-by-one classification share cache entries.
+        prompts = [self._build_user_prompt(issue, "") for issue in issues]
+        classifications: list[Optional[Classification]] = []
+        for prompt in prompts:
+            cached = self._cache_get(prompt)
+            classifications.append(self._parse_response(cached) if cached is not None else None)
+
+        pending = [i for i, c in enumerate(classifications) if c is None]
+        group = [issues[i] for i in pending]
+
+        items = None
+        if len(group) > 1:
+            try:
+                # Output (and so generation time) grows with the group
+                response = self._call_api(
+                    self._build_group_prompt(group),
+                    max_tokens=500 * len(group),
+                    timeout=30 * len(group),
+                )
+            except Exception as e:
+                # Auth, billing, exhausted rate-limit retries or a timeout (which
+                # may already be billed): one call per issue would only repeat it.
+                for i in pending:
+                    classifications[i] = Classification.error_result(str(e))
+                return classifications
+            items = self._parse_group_response(response, group)
+
+        if items is None:
+            for i in pending:
+                classifications[i] = self.classify_issue(issues[i])
+        else:
+            for i, item in zip(pending, items):
+                classifications[i] = Classification.from_json(item, response)
+                self._cache_set(prompts[i], json.dumps(item))
+
+        return classifications
+
+    def _build_group_prompt(self, issues: list[dict]) -> str:
+        """Build one user prompt describing several issues."""
+        sections = []
+        for issue in issues:
+            title, labels_str, comments_str, body = self._prompt_fields(issue)
+            section = (
+                f"## Issue {issue['issue_id']}\n"
+                f"Title: {title}\n"
+                f"Labels: {labels_str}\n"
+                f"Description (truncated if long):\n{body}"
+            )
+            if comments_str:
+                section += f"\n{self.COMMENTS_HEADER}\n{comments_str}"
+            sections.append(section)
+
+        return self.group_template.format_map({
+            "count": len(issues),
+            "issues": "\n\n".join(sections),
+        })
+
+    def _parse_group_response(self, response: str, issues: list[dict]) -> Optional[list[dict]]:
+        """Parse a grouped reply into per-issue dicts, or None if it doesn't cover every issue in order."""
+        try:
+            data = json_loads(self._strip_code_fence(response))
+        except json.JSONDecodeError:
+            return None
+
+        if not isinstance(data, list) or len(data) != len(issues):
+            return None
+
+        for issue, item in zip(issues, data):
+            if not isinstance(item, dict):
+                return None
+            if str(item.get("id", issue["issue_id"])).lstrip("#") != str(issue["issue_id"]):
+                return None
+        return data
+
     def classify_batch(
         self,
         issues: list[dict],
         on_progress: callable = None,
+        max_workers: int = BATCH_WORKERS,
     ) -> list[tuple[dict, Classification]]:
         """
-        Classify a batch of issues.
+        Classify a batch of issues concurrently, one LLM call per issue.
+
+        Public entry point for callers outside the triage pipeline (the
+        orchestrator classifies through grouped calls instead). Calls share
+        the pooled keep-alive session, so up to max_workers requests are in
+        flight over reused connections.
 
         Args:
             issues: List of issue dictionaries
-            on_progress: Optional callback(current, total, issue)
+            on_progress: Optional callback(current, total, issue), called as each issue completes
+            max_workers: Maximum concurrent API calls
 
         Returns:
-            List of (issue, classification) tuples
+            List of (issue, classification) tuples, in input order
         """
-        results = []
+        classifications: list[Optional[Classification]] = [None] * len(issues)
         total = len(issues)
 
-        for i, issue in enumerate(issues):
-            if on_progress:
-                on_progress(i + 1, total, issue)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.classify_issue, issue): i for i, issue in enumerate(issues)}
+            for completed, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                classifications[i] = future.result()
+                if on_progress:
+                    on_progress(completed, total, issues[i])
+
+        return list(zip(issues, classifications))
+
+    def classify_batch_grouped(
+        self,
+        issues: list[dict],
+        group_size: int = GROUP_SIZE,
+        max_workers: int = BATCH_WORKERS,
+    ) -> list[tuple[dict, Classification]]:
+        """
+        Classify a batch of issues with one LLM call per group of issues.
+
+        Public entry point for callers outside the triage pipeline (scripts,
+        one-off batches); the orchestrator streams its own groups into
+        classify_group() as their comments arrive. Groups go through
+        classify_group(), so cached issues are skipped and a reply that doesn't
+        match its group falls back to one call per issue.
 
-            classification = self.classify_issue(issue)
-            results.append((issue, classification))
+        Args:
+            issues: List of issue dictionaries
+            group_size: Issues per LLM call
+            max_workers: Maximum concurrent grouped calls
 
-        return results
+        Returns:
+            List of (issue, classification) tuples, in input order
+        """
+        groups = [issues[i:i + group_size] for i in range(0, len(issues), group_size)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            classifications = [c for group in executor.map(self.classify_group, groups) for c in group]
+        return list(zip(issues, classifications))
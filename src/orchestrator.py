@@ -1,8 +1,10 @@
 """Main orchestrator for the issue triage pipeline."""
 
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
+from hashlib import blake2b
+from pathlib import Path
 from typing import Optional
 
 from .github_fetcher import GitHubFetcher
@@ -14,6 +16,15 @@ from .sheets_persistence import SheetsPersistence
 class TriageOrchestrator:
     """Orchestrates the full issue triage pipeline."""
 
+    # Concurrent LLM calls; rate-limited (429) calls back off and retry
+    LLM_WORKERS = 8
+    # Concurrent GitHub comment fetches feeding the LLM groups
+    COMMENT_WORKERS = 10
+    # Concurrent re-triage calls (one LLM call per flagged issue)
+    RETRIAGE_WORKERS = 5
+    # Holds run_update's since cursor, one file per (repo, spreadsheet) pair
+    SYNC_CURSOR_DIR = ".cache"
+
     def __init__(
         self,
         github_token: str,
@@ -30,6 +41,12 @@ class TriageOrchestrator:
         self.sheets = SheetsPersistence(sheets_credentials, spreadsheet_url)
 
         self._connected = False
+        # Newest GitHub updated_at seen by run_update; only run_update advances
+        # it. Keyed by repo and spreadsheet so switching either starts afresh.
+        sheet_key = blake2b(spreadsheet_url.encode(), digest_size=6).hexdigest()
+        self._sync_cursor_path = (
+            Path(self.SYNC_CURSOR_DIR) / f"update_cursor_{repo.replace('/', '__')}_{sheet_key}"
+        )
 
     def connect(self):
         """Connect to Google Sheets and set up worksheets."""
@@ -39,6 +56,11 @@ class TriageOrchestrator:
         self._connected = True
         print("Connected and sheets initialized.")
 
+    def close(self):
+        """Release pooled HTTP connections and local caches."""
+        self.fetcher.close()
+        self.classifier.close()
+
     def run_initial_triage(
         self,
         max_pages: int = 5,
@@ -80,31 +102,14 @@ class TriageOrchestrator:
         if classify_candidates and candidates:
             print(f"\nClassifying {len(candidates)} candidates with LLM (parallel, fetching comments)...")
 
-            def process_candidate(item):
-                issue, filter_result = item
-                # Fetch comments for issues that have them
-                if issue.get("comments_count", 0) > 0:
-                    issue["recent_comments"] = self.fetcher.fetch_comments(
-                        issue["issue_id"], max_comments=5
-                    )
-                classification = self.classifier.classify_issue(issue)
-                return (issue, classification, filter_result)
-
-            # Process in parallel with 5 workers (balance speed vs rate limits)
             completed = 0
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                futures = {executor.submit(process_candidate, item): item for item in candidates}
-                for future in as_completed(futures):
-                    issue, classification, filter_result = future.result()
-                    completed += 1
-                    print(f"  [{completed}/{len(candidates)}] #{issue['issue_id']}: {issue['title'][:50]}...")
-
-                    # Post-classification filter: mark as Filtered if skill_match is No
-                    classification_dict = self._classification_to_dict(classification)
-                    if classification_dict and classification_dict.get("skill_match") == "No":
-                        results.append((issue, classification_dict, self._filter_result_to_dict(filter_result), "Filtered"))
-                    else:
-                        results.append((issue, classification_dict, self._filter_result_to_dict(filter_result), "Candidate"))
+            for issue, classification, filter_result in self._classify_candidates(candidates):
+                completed += 1
+                print(f"  [{completed}/{len(candidates)}] #{issue['issue_id']}: {issue['title'][:50]}...")
+
+                # Post-classification filter: mark as Filtered if skill_match is No
+                status = "Filtered" if classification.skill_match == "No" else "Candidate"
+                results.append((issue, classification, self._filter_result_to_dict(filter_result), status))
 
         for issue, filter_result in non_candidates:
             results.append((
@@ -116,12 +121,13 @@ class TriageOrchestrator:
 
         if not dry_run and results:
             print(f"\nWriting {len(results)} issues to Google Sheets...")
-            existing_cache = self.sheets.get_existing_issues()
             for i, (issue, classification, filter_result, status) in enumerate(results):
-                self.sheets.upsert_issue(issue, classification, filter_result, status, existing_cache)
+                self.sheets.upsert_issue(issue, classification, filter_result, status)
                 if (i + 1) % 10 == 0:
                     print(f"  Written {i + 1}/{len(results)}...")
 
+            self.sheets.flush()
+
             print("Updating Active Candidates sheet...")
             self.sheets.update_active_candidates()
 
@@ -147,9 +153,11 @@ class TriageOrchestrator:
         if not self._connected:
             self.connect()
 
-        print("\nFetching recent issues...")
-        issues = self.fetcher.fetch_open_issues(max_pages=max_pages)
         existing = self.sheets.get_existing_issues()
+        last_sync = self._read_sync_cursor()
+
+        print(f"\nFetching issues updated since {last_sync or 'the beginning'}...")
+        issues, complete = self.fetcher.fetch_updated_issues(last_sync, max_pages=max_pages)
 
         new_issues = []
         changed_issues = []
@@ -176,11 +184,10 @@ class TriageOrchestrator:
             candidates = [(i, fr) for i, fr in filtered if fr.is_auto_candidate]
 
             print(f"\nClassifying {len(candidates)} new candidates...")
-            for issue, filter_result in candidates:
-                classification = self.classifier.classify_issue(issue)
+            for issue, classification, filter_result in self._classify_candidates(candidates):
                 self.sheets.upsert_issue(
                     issue,
-                    self._classification_to_dict(classification),
+                    classification,
                     self._filter_result_to_dict(filter_result),
                     "Candidate",
                 )
@@ -194,8 +201,15 @@ class TriageOrchestrator:
                         "Filtered",
                     )
 
+        self.sheets.flush()
         self.sheets.update_active_candidates()
 
+        # Only a fully fetched window may move the cursor past it
+        if not complete:
+            print(f"Listing cut off at {max_pages} pages; raise --max-pages to advance the sync cursor")
+        elif issues:
+            self._write_sync_cursor(max(issue["updated_at"] for issue in issues))
+
         return {
             "new_issues": len(new_issues),
             "changed_issues": len(changed_issues),
@@ -214,73 +228,133 @@ class TriageOrchestrator:
 
         existing = self.sheets.get_existing_issues()
 
-        for issue_id in flagged_ids:
-            print(f"Re-triaging #{issue_id}...")
+        print("Fetching flagged issues from GitHub...")
+        try:
+            fetched = {i["issue_id"]: i for i in self.fetcher.graphql_fetch_issues(flagged_ids)}
+        except Exception as e:
+            print(f"  GraphQL fetch failed ({e}), falling back to REST...")
+            fetched = dict(zip(flagged_ids, self.fetcher.enrich_many(flagged_ids)))
 
-            try:
-                issue = self.fetcher.fetch_single_issue(issue_id)
-            except Exception as e:
-                print(f"  Error fetching: {e}")
-                continue
+        results = []
+        with ThreadPoolExecutor(max_workers=self.RETRIAGE_WORKERS) as executor:
+            futures = {}
+            for issue_id in flagged_ids:
+                issue = fetched.get(issue_id)
+                if issue is None or isinstance(issue, Exception):
+                    print(f"  Error fetching #{issue_id}: {issue or 'issue not found'}")
+                    continue
+                futures[executor.submit(self._retriage_one, issue, existing.get(issue_id, {}))] = issue_id
+
+            for future in as_completed(futures):
+                issue_id = futures[future]
+                try:
+                    results.append(future.result())
+                    print(f"Re-triaged #{issue_id}")
+                except Exception as e:
+                    print(f"  Error re-triaging #{issue_id}: {e}")
+
+        self.sheets.batch_upsert_issues(results, status="Re-triaged")
+        self.sheets.update_active_candidates()
 
-            old_data = existing.get(issue_id, {})
-            previous = {
-                "difficulty": old_data.get("LLM Difficulty"),
-                "skill_match": old_data.get("LLM Skill Match"),
-            }
+        return {"retriaged": len(flagged_ids)}
 
-            classification = self.classifier.classify_issue(
-                issue,
-                previous_classification=previous,
-            )
+    def _retriage_one(self, issue: dict, old_data: dict) -> tuple[dict, Classification, dict]:
+        """Re-classify one flagged issue against its previous ledger entry."""
+        previous = {
+            "difficulty": old_data.get("LLM Difficulty"),
+            "skill_match": old_data.get("LLM Skill Match"),
+        }
 
-            filter_result = self.filter.filter_issue(issue)
+        classification = self.classifier.classify_issue(
+            issue,
+            previous_classification=previous,
+        )
 
-            self.sheets.upsert_issue(
-                issue,
-                self._classification_to_dict(classification),
-                self._filter_result_to_dict(filter_result),
-                "Re-triaged",
-            )
+        filter_result = self.filter.filter_issue(issue)
 
-        self.sheets.update_active_candidates()
+        return (
+            issue,
+            classification,
+            self._filter_result_to_dict(filter_result),
+        )
 
-        return {"retriaged": len(flagged_ids)}
+    def _classify_candidates(self, candidates: list[tuple[dict, FilterResult]]):
+        """
+        Classify candidates concurrently, fetching their comments first.
+
+        Comments are fetched on their own pool of COMMENT_WORKERS threads.
+        Candidates join a group as soon as their comments arrive, and each
+        full group of GROUP_SIZE is sent to the LLM pool (up to LLM_WORKERS
+        groups in flight) while the remaining fetches continue.
+
+        Yields:
+            (issue, classification, filter_result) tuples as groups complete
+        """
+        def fetch_comments(issue):
+            issue["recent_comments"] = self.fetcher.fetch_comments(issue["issue_id"], max_comments=5)
+
+        def classify_group(group):
+            classifications = self.classifier.classify_group([issue for issue, _ in group])
+            return [
+                (issue, classification, filter_result)
+                for (issue, filter_result), classification in zip(group, classifications)
+            ]
+
+        group_size = self.classifier.GROUP_SIZE
+        with ThreadPoolExecutor(max_workers=self.COMMENT_WORKERS) as fetch_executor, \
+                ThreadPoolExecutor(max_workers=self.LLM_WORKERS) as llm_executor:
+            fetching = {}
+            ready = []
+            for issue, filter_result in candidates:
+                if issue.get("comments_count", 0) > 0:
+                    fetching[fetch_executor.submit(fetch_comments, issue)] = (issue, filter_result)
+                else:
+                    ready.append((issue, filter_result))
+
+            classifying = set()
+            while True:
+                # Send full groups, and the last partial one once all comments are in
+                while len(ready) >= group_size or (ready and not fetching):
+                    classifying.add(llm_executor.submit(classify_group, ready[:group_size]))
+                    ready = ready[group_size:]
+
+                if not fetching and not classifying:
+                    break
+
+                done, _ = wait([*fetching, *classifying], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in fetching:
+                        future.result()
+                        ready.append(fetching.pop(future))
+                    else:
+                        classifying.discard(future)
+                        yield from future.result()
+
+    def _read_sync_cursor(self) -> Optional[str]:
+        """Return the updated_at timestamp the last run_update reached, if any."""
+        try:
+            return self._sync_cursor_path.read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_sync_cursor(self, updated_at: str):
+        """Record the newest updated_at timestamp processed by run_update."""
+        self._sync_cursor_path.parent.mkdir(parents=True, exist_ok=True)
+        self._sync_cursor_path.write_text(updated_at)
 
     def _has_meaningful_change(self, issue: dict, old: dict) -> bool:
         """Check if an issue has changed meaningfully since last check."""
         if issue.get("updated_at") != old.get("Updated At (GitHub)"):
             return True
 
-        old_labels = set(old.get("Labels", "").split(", "))
-        new_labels = set(issue.get("labels", []))
-        if old_labels != new_labels:
+        old_labels = old.get("Labels", "")
+        new_labels = issue.get("labels", [])
+        # Compare counts before building sets; an empty cell means no labels
+        old_count = old_labels.count(", ") + 1 if old_labels else 0
+        if len(new_labels) != old_count:
             return True
 
-        return False
-
-    def _classification_to_dict(self, c: Classification) -> Optional[dict]:
-        """Convert Classification to dict for storage."""
-        if c.error:
-            return {
-                "difficulty": "Error",
-                "skill_match": "Error",
-                "scope_clarity": "Error",
-                "test_focused": "Error",
-                "risk_flags": [c.error],
-                "one_line_reason": f"Classification failed: {c.error}",
-                "summary": "",
-            }
-
-        return {
-            "difficulty": c.difficulty,
-            "skill_match": c.skill_match,
-            "scope_clarity": c.scope_clarity,
-            "test_focused": c.test_focused,
-            "risk_flags": c.risk_flags,
-            "one_line_reason": c.one_line_reason,
-            "summary": c.summary,
-        }
+        return old_count > 0 and set(old_labels.split(", ")) != set(new_labels)
 
     def _filter_result_to_dict(self, fr: FilterResult) -> dict:
         """Convert FilterResult to dict for storage."""
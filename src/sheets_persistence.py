@@ -1,10 +1,16 @@
 """Google Sheets persistence layer for issue triage."""
 
+import threading
+import time
+
 import gspread
+from gspread.utils import ValueRenderOption
 from google.oauth2.service_account import Credentials
 from datetime import datetime
 from typing import Optional
 
+from .llm_classifier import Classification
+
 
 class SheetsPersistence:
     """Manages issue triage data in Google Sheets."""
@@ -37,6 +43,8 @@ class SheetsPersistence:
 
     ACTIVE_HEADERS = ["Issue ID", "Title", "URL", "Difficulty", "Skill Match", "Summary", "Reason"]
 
+    LEDGER_CACHE_TTL = 60  # Seconds a ledger read is reused between writes
+
     def __init__(
         self,
         credentials_path: str,
@@ -46,6 +54,18 @@ class SheetsPersistence:
         self.spreadsheet_url = spreadsheet_url
         self._client = None
         self._spreadsheet = None
+        # Ledger writes queued by upsert_issue / mark_needs_retriage until flush()
+        self._pending_updates: list[dict] = []
+        self._pending_appends: list[list] = []
+        # Ledger row number per issue ID, so upserts never search the sheet
+        self._row_index: dict[int, int] = {}
+        self._next_row = 2
+        # Guards the queues and the row index, so upserts can come from worker threads
+        self._lock = threading.Lock()
+        # (read time, records) from the last ledger read; cleared by flush()
+        self._ledger_cache: Optional[tuple[float, list[dict]]] = None
+        # Candidate rows last written to Active Candidates (None until first write)
+        self._active_count: Optional[int] = None
 
     def connect(self):
         """Establish connection to Google Sheets."""
@@ -55,6 +75,10 @@ class SheetsPersistence:
         )
         self._client = gspread.authorize(creds)
         self._spreadsheet = self._client.open_by_url(self.spreadsheet_url)
+        try:
+            self._refresh_row_index()
+        except gspread.WorksheetNotFound:
+            pass  # Created by setup_sheets(); the index starts empty
 
     def setup_sheets(self):
         """Create required sheets if they don't exist, using Google Sheets Tables."""
@@ -118,26 +142,41 @@ class SheetsPersistence:
         except Exception as e:
             print(f"  Note: Could not add dropdown validation ({e}).")
 
-    def get_existing_issues(self) -> dict[int, dict]:
-        """Get all existing issues from the ledger as a dict keyed by issue ID."""
+    def _read_ledger_records(self) -> list[dict]:
+        """Read all ledger rows, in sheet order, as dicts keyed by header."""
+        cached = self._ledger_cache
+        if cached and time.monotonic() - cached[0] < self.LEDGER_CACHE_TTL:
+            return cached[1]
+
         ledger = self._spreadsheet.worksheet("Triage Ledger")
-        try:
-            records = ledger.get_all_records(expected_headers=self.LEDGER_HEADERS)
-        except Exception:
-            # Fallback: read raw values if headers don't match
-            all_values = ledger.get_all_values()
-            if len(all_values) <= 1:
-                return {}
-            headers = self.LEDGER_HEADERS
-            records = []
-            for row in all_values[1:]:
-                record = {}
-                for i, h in enumerate(headers):
-                    record[h] = row[i] if i < len(row) else ""
-                records.append(record)
+        headers = self.LEDGER_HEADERS
+        last_column = chr(ord("A") + len(headers) - 1)
+        # One values read; unformatted so numbers come back as numbers
+        rows = ledger.get(f"A2:{last_column}", value_render_option=ValueRenderOption.unformatted)
+
+        padding = [""] * len(headers)
+        records = [dict(zip(headers, row + padding[len(row):])) for row in rows]
 
+        self._ledger_cache = (time.monotonic(), records)
+        return records
+
+    def _refresh_row_index(self):
+        """Rebuild the issue ID -> row number index from the ledger's first column."""
+        ledger = self._spreadsheet.worksheet("Triage Ledger")
+        column = ledger.col_values(1)
+
+        self._row_index = {}
+        for row_num, value in enumerate(column[1:], start=2):  # Row 1 is the header
+            try:
+                self._row_index[int(value)] = row_num
+            except ValueError:
+                pass
+        self._next_row = len(column) + 1
+
+    def get_existing_issues(self) -> dict[int, dict]:
+        """Get all existing issues from the ledger as a dict keyed by issue ID."""
         result = {}
-        for record in records:
+        for record in self._read_ledger_records():
             issue_id = record.get("Issue ID")
             if issue_id:
                 try:
@@ -149,29 +188,46 @@ class SheetsPersistence:
     def upsert_issue(
         self,
         issue: dict,
-        classification: Optional[dict] = None,
+        classification: Optional[Classification] = None,
         filter_result: Optional[dict] = None,
         status: str = "New",
-        existing_cache: Optional[dict] = None,
     ):
-        """Insert or update an issue in the ledger."""
-        ledger = self._spreadsheet.worksheet("Triage Ledger")
-        existing = existing_cache if existing_cache is not None else self.get_existing_issues()
+        """Queue an insert or update of an issue in the ledger (written by flush())."""
         issue_id = issue["issue_id"]
-
         row_data = self._build_row(issue, classification, filter_result, status)
 
-        if issue_id in existing:
-            row_num = self._find_row_by_issue_id(ledger, issue_id)
+        with self._lock:
+            row_num = self._row_index.get(issue_id)
             if row_num:
-                ledger.update(f"A{row_num}", [row_data])
-        else:
-            ledger.append_row(row_data)
+                self._pending_updates.append({"range": f"A{row_num}", "values": [row_data]})
+            else:
+                # Reserve the row the append will land on, so a second upsert of
+                # the same issue before flush() becomes an update of that row.
+                self._pending_appends.append(row_data)
+                self._row_index[issue_id] = self._next_row
+                self._next_row += 1
+
+    def flush(self):
+        """Write all queued ledger changes: one append plus one batch update."""
+        with self._lock:
+            if not self._pending_updates and not self._pending_appends:
+                return
+
+            ledger = self._spreadsheet.worksheet("Triage Ledger")
+            # Appends go first: queued updates may target rows reserved for them
+            if self._pending_appends:
+                ledger.append_rows(self._pending_appends, value_input_option="RAW")
+                self._pending_appends = []
+                self._refresh_row_index()
+            if self._pending_updates:
+                ledger.batch_update(self._pending_updates, value_input_option="RAW")
+                self._pending_updates = []
+            self._ledger_cache = None
 
     def _build_row(
         self,
         issue: dict,
-        classification: Optional[dict],
+        classification: Optional[Classification],
         filter_result: Optional[dict],
         status: str,
     ) -> list:
@@ -179,11 +235,18 @@ class SheetsPersistence:
         now = datetime.utcnow().isoformat()
 
         labels_str = ", ".join(issue.get("labels", []))
-        risk_flags = ""
         positive_signals = ""
 
-        if classification:
-            risk_flags = ", ".join(classification.get("risk_flags", []))
+        c = classification
+        if c is None:
+            llm_columns = ["", "", "", "", ""]
+            reason = summary = ""
+        elif c.error:
+            llm_columns = ["Error", "Error", "Error", "Error", c.error]
+            reason, summary = f"Classification failed: {c.error}", ""
+        else:
+            llm_columns = [c.difficulty, c.skill_match, c.scope_clarity, c.test_focused, ", ".join(c.risk_flags)]
+            reason, summary = c.one_line_reason, c.summary
 
         if filter_result:
             positive_signals = ", ".join(filter_result.get("positive_signals", []))
@@ -194,14 +257,10 @@ class SheetsPersistence:
             issue.get("url", ""),
             labels_str,
             status,
-            classification.get("difficulty", "") if classification else "",
-            classification.get("skill_match", "") if classification else "",
-            classification.get("scope_clarity", "") if classification else "",
-            classification.get("test_focused", "") if classification else "",
-            risk_flags,
+            *llm_columns,  # Difficulty, Skill Match, Scope Clarity, Test Focused, Risk Flags
             "",  # Manual Confidence - user fills
-            classification.get("one_line_reason", "") if classification else "",
-            classification.get("summary", "") if classification else "",
+            reason,
+            summary,
             now,
             issue.get("updated_at", ""),
             "FALSE",
@@ -209,36 +268,20 @@ class SheetsPersistence:
             positive_signals,
         ]
 
-    def _find_row_by_issue_id(self, worksheet, issue_id: int) -> Optional[int]:
-        """Find the row number for a given issue ID."""
-        try:
-            cell = worksheet.find(str(issue_id), in_column=1)
-            return cell.row if cell else None
-        except Exception:
-            return None
-
     def mark_needs_retriage(self, issue_ids: list[int]):
-        """Mark issues as needing re-triage."""
-        ledger = self._spreadsheet.worksheet("Triage Ledger")
+        """Queue marking issues as needing re-triage (written by flush())."""
+        column = chr(ord("A") + self.LEDGER_HEADERS.index("Needs Re-triage"))
 
-        for issue_id in issue_ids:
-            row_num = self._find_row_by_issue_id(ledger, issue_id)
-            if row_num:
-                ledger.update(f"O{row_num}", [["TRUE"]])
+        with self._lock:
+            for issue_id in issue_ids:
+                row_num = self._row_index.get(issue_id)
+                if row_num:
+                    self._pending_updates.append({"range": f"{column}{row_num}", "values": [["TRUE"]]})
 
     def update_active_candidates(self):
         """Update the Active Candidates sheet based on ledger data."""
-        ledger = self._spreadsheet.worksheet("Triage Ledger")
-        active = self._spreadsheet.worksheet("Active Candidates")
-
-        # Use expected_headers to avoid duplicate header errors
-        try:
-            records = ledger.get_all_records(expected_headers=self.LEDGER_HEADERS)
-        except Exception:
-            records = self.get_existing_issues().values()
-
         candidates = []
-        for record in records:
+        for record in self._read_ledger_records():
             status = record.get("Current Status", "")
             skill_match = record.get("LLM Skill Match", "")
             difficulty = record.get("LLM Difficulty", "")
@@ -260,39 +303,42 @@ class SheetsPersistence:
                     record.get("Reason"),
                 ])
 
-        active.clear()
-        active.update("A1", [self.ACTIVE_HEADERS])
+        last_column = chr(ord("A") + len(self.ACTIVE_HEADERS) - 1)
 
-        if candidates:
-            active.update("A2", candidates)
+        # Only rows left over from a longer previous list need clearing
+        if self._active_count is None or len(candidates) < self._active_count:
+            active = self._spreadsheet.worksheet("Active Candidates")
+            active.batch_clear([f"A{len(candidates) + 2}:{last_column}"])
 
-        active.freeze(rows=1)
+        data = [{"range": f"'Active Candidates'!A1:{last_column}1", "values": [self.ACTIVE_HEADERS]}]
+        if candidates:
+            data.append({
+                "range": f"'Active Candidates'!A2:{last_column}{len(candidates) + 1}",
+                "values": candidates,
+            })
+        self._spreadsheet.values_batch_update({"valueInputOption": "RAW", "data": data})
+        self._active_count = len(candidates)
 
     def get_issues_needing_retriage(self) -> list[int]:
         """Get list of issue IDs that need re-triage."""
-        ledger = self._spreadsheet.worksheet("Triage Ledger")
-        try:
-            records = ledger.get_all_records(expected_headers=self.LEDGER_HEADERS)
-        except Exception:
-            records = self.get_existing_issues().values()
-
         return [
-            int(r["Issue ID"])
-            for r in records
-            if r.get("Needs Re-triage", "").upper() == "TRUE"
+            issue_id
+            for issue_id, r in self.get_existing_issues().items()
+            if str(r.get("Needs Re-triage", "")).upper() == "TRUE"
         ]
 
-    def batch_upsert(
+    def batch_upsert_issues(
         self,
-        items: list[tuple[dict, dict, dict]],
+        items: list[tuple[dict, Optional[Classification], Optional[dict]]],
         status: str = "New",
     ):
         """
-        Batch upsert multiple issues.
+        Insert or update many issues and write them with one flush.
 
         Args:
             items: List of (issue, classification, filter_result) tuples
-            status: Default status for new issues
+            status: Status written for every issue
         """
         for issue, classification, filter_result in items:
             self.upsert_issue(issue, classification, filter_result, status)
+        self.flush()